@@ -1,59 +1,158 @@
 #!/usr/bin/env python
 import asyncio, json, time, traceback
+import msgpack
 import websockets
 
+try:
+    import orjson  # much faster json, encodes straight to bytes
+except ImportError:
+    orjson = None
+try:
+    import uvloop  # libuv-backed event loop, not available on Windows
+except ImportError:
+    uvloop = None
+json_encode = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode  # stdlib fallback
+
 JOINT_NAMES = ["shoulder_pan","shoulder_lift","elbow_flex","wrist_flex","wrist_roll","gripper"]
-q = [0.0]*len(JOINT_NAMES)
+q = [0.0]*len(JOINT_NAMES)  # sim state: persists across clients
+HEARTBEAT_S = 0.1  # resend state at least this often even when q is idle
+packer = msgpack.Packer(use_bin_type=True)  # reused across sends
+
+class Session:
+    """Per-connection state, created in handle() so nothing carries over to the next client."""
+    def __init__(self):
+        self.binary = False  # answer in whatever the client speaks: msgpack (binary frames) or json (text frames)
+        self.pending_cmds = []  # raw cmd frames since the last tx tick, decoded newest-first by tx_loop
+        self.q_changed = asyncio.Event()  # set by rx_loop on every cmd, consumed by tx_loop
+
+def decode(msg):
+    if isinstance(msg, bytes):
+        return msgpack.unpackb(msg, raw=False)
+    return orjson.loads(msg) if orjson else json.loads(msg)
+
+def encode(obj, binary=False):
+    if binary:
+        return packer.pack(obj)
+    return orjson.dumps(obj) if orjson else json_encode(obj).encode()
+
+async def send(ws, obj, binary):
+    # json bytes still go out as a text frame
+    await ws.send(encode(obj, binary), text=not binary)
+
+# json state frame = constant head + joint_pos + timestamp; only the tail is formatted per send
+STATE_HEAD = encode({"type": "state", "names": JOINT_NAMES})[:-1] + b',"joint_pos":'
 
-async def rx_loop(ws):
-    """Receive commands continuously; update q and log."""
-    global q
+def encode_json_state(joint_pos, ts):
+    return b"".join((STATE_HEAD, encode(joint_pos), b',"timestamp":', repr(ts).encode(), b"}"))
+
+def is_msgpack_map(msg):
+    # control messages ("hello") are msgpack maps; compact cmds are arrays
+    return msg[:1] and (msg[0] & 0xF0 == 0x80 or msg[0] in (0xDE, 0xDF))
+
+async def rx_loop(ws, session):
+    """Receive continuously. Cmds are only queued raw; tx_loop decodes just the newest valid one."""
     async for msg in ws:
-        try:
-            d = json.loads(msg)
-        except Exception:
-            print("[sim] bad json")
+        session.binary = isinstance(msg, bytes)
+        if session.binary and is_msgpack_map(msg):
+            await handle_control(ws, msg)
             continue
+        # only the last target matters for joint position: a burst of cmds costs one decode
+        session.pending_cmds.append(msg)
+        session.q_changed.set()
+
+async def handle_control(ws, msg):
+    try:
+        d = decode(msg)
+    except Exception:
+        print("[sim] bad message")
+        return
+    t = d.get("type")
+    if t != "hello":
+        print("[sim] non-cmd message:", t)
+        return
+    if d.get("names") != JOINT_NAMES:
+        print("[sim] WARN: client joint names differ:", d.get("names"))
+    if d.get("mode") != "joint_position":
+        print("[sim] unsupported mode:", d.get("mode"))
+    # compact states carry no names, so tell the client our joint order once
+    await send(ws, {"type": "hello", "names": JOINT_NAMES}, binary=True)
+
+def cmd_target(msg):
+    """Decode and validate one raw cmd; returns its target, or None if it is not a usable cmd."""
+    try:
+        d = decode(msg)
+    except Exception:
+        print("[sim] bad message")
+        return None
 
+    if isinstance(d, list):
+        # compact msgpack cmd: [seq, target, timestamp] (names/mode were sent once in "hello")
+        tgt = d[1] if len(d) == 3 else []
+    elif isinstance(d, dict):
         t = d.get("type")
         if t != "cmd":
             # you should only see "state" here if you later add other messages
             print("[sim] non-cmd message:", t)
-            continue
+            return None
 
         if d.get("mode") != "joint_position":
             print("[sim] unsupported mode:", d.get("mode"))
-            continue
+            return None
 
         tgt = d.get("target", [])
-        if not (isinstance(tgt, list) and len(tgt) == len(JOINT_NAMES)):
-            print("[sim] bad target len:", len(tgt))
-            continue
+    else:
+        print("[sim] bad message")
+        return None
+
+    if not (isinstance(tgt, list) and len(tgt) == len(JOINT_NAMES)):
+        print("[sim] bad target len:", len(tgt) if isinstance(tgt, list) else tgt)
+        return None
+    # e.g. a null (orjson's NaN) must not reach q: the log line below formats every value
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in tgt):
+        print("[sim] bad target values:", tgt)
+        return None
+    return tgt
 
-        q[:] = tgt
-        # log first few joints so we don’t spam
-        print("[sim <-cmd]", ", ".join(f"{v:+.3f}" for v in q[:6]), "…")
+def apply_latest_cmd(session):
+    """Set q to the newest valid pending cmd. Normally that is the last one, so a burst costs one decode."""
+    msgs, session.pending_cmds = session.pending_cmds, []
+    for msg in reversed(msgs):
+        tgt = cmd_target(msg)
+        if tgt is not None:
+            break
+    else:
+        return
 
-async def tx_loop(ws):
-    """Send state at ~60 Hz."""
+    q[:] = tgt
+    # log first few joints so we don’t spam
+    print("[sim <-cmd]", ", ".join(f"{v:+.3f}" for v in q[:6]), "…")
+
+async def tx_loop(ws, session):
+    """Send state when q changes (at most ~60 Hz), or as a heartbeat every HEARTBEAT_S when idle."""
     while True:
-        state = {
-            "type": "state",
-            "names": JOINT_NAMES,
-            "joint_pos": q,
-            "timestamp": time.time()
-        }
         try:
-            await ws.send(json.dumps(state))
+            await asyncio.wait_for(session.q_changed.wait(), timeout=HEARTBEAT_S)
+        except asyncio.TimeoutError:
+            pass
+        session.q_changed.clear()
+        apply_latest_cmd(session)
+        try:
+            if session.binary:
+                # compact msgpack state: [joint_pos, timestamp], same joint order as "hello"
+                await send(ws, (q, time.time()), binary=True)
+            else:
+                await ws.send(encode_json_state(q, time.time()), text=True)
         except websockets.ConnectionClosed:
             break
+        # cmds arriving during this pause collapse into the next send
         await asyncio.sleep(1/60)
 
 async def handle(ws):
     peer = ws.remote_address
     print(f"[sim] client connected: {peer}")
     try:
-        await asyncio.gather(rx_loop(ws), tx_loop(ws))
+        session = Session()
+        await asyncio.gather(rx_loop(ws, session), tx_loop(ws, session))
     except websockets.ConnectionClosed:
         print("[sim] client disconnected")
     except Exception:
@@ -64,10 +163,14 @@ async def main():
     async with websockets.serve(
         handle, host, port,
         ping_interval=None,   # no keepalive pings
+        compression=None,     # permessage-deflate only costs CPU on ~100 B frames
         max_queue=2
     ):
         print(f"[sim] WebSocket server running on ws://{host}:{port}")
         await asyncio.Future()  # run forever
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
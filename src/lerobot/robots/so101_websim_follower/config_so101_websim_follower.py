@@ -8,6 +8,9 @@ class SO101WebSimFollowerConfig(RobotConfig):
     # where to stream joint targets
     ws_url: str = "ws://127.0.0.1:8765"
 
+    # wire encoding: "json" (text frames, what DexSuite speaks) or "msgpack" (binary frames, smaller/faster)
+    wire_format: str = "json"
+
     # joint names must match your teleop action keys "<name>.pos"
     joint_names: list[str] = field(default_factory=lambda: [
         "shoulder_pan",
@@ -24,3 +27,8 @@ class SO101WebSimFollowerConfig(RobotConfig):
     # limits (optional; leave None to skip clamping)
     joint_min: list[float] | None = None
     joint_max: list[float] | None = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.wire_format not in ["json", "msgpack"]:
+            raise ValueError(f"`wire_format` must be 'json' or 'msgpack', got {self.wire_format!r}")
@@ -1,15 +1,134 @@
 #!/usr/bin/env python
 from __future__ import annotations
-import asyncio, json, time
-from functools import cached_property
+import asyncio, concurrent.futures, json, logging, threading, time
+from functools import cache, cached_property
 from typing import Any, Optional
 
-import websockets
+import numpy as np
 
 from ..robot import Robot
-from ..utils import ensure_safe_goal_position
 from .config_so101_websim_follower import SO101WebSimFollowerConfig
 
+logger = logging.getLogger(__name__)
+
+# the websim deps are optional: every lerobot-teleoperate launch imports this module, whatever the robot type
+PICOWS_AVAILABLE = True
+try:
+    from picows import WSCloseCode, WSFrame, WSListener, WSMsgType, WSTransport, ws_connect
+except ImportError:
+    WSListener = object  # keeps _StateListener definable; the follower refuses to start without picows
+    PICOWS_AVAILABLE = False
+
+MSGPACK_AVAILABLE = True
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+ORJSON_AVAILABLE = True
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# stdlib fallback: compact separators, and no circular check (payloads are flat)
+_json_encode = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+
+UVLOOP_AVAILABLE = True
+try:
+    import uvloop
+except ImportError:  # e.g. Windows
+    uvloop = None
+    UVLOOP_AVAILABLE = False
+
+
+def _apply_limits(goal, present, lo, hi, max_rel):
+    """
+    Relative step limit around `present`, then absolute [lo, hi] clamp, in one pass.
+    The safe targets are written into `present` in place; returns True if the relative limit bound.
+    """
+    rel_clamped = False
+    for i in range(goal.size):
+        v = goal[i]
+        d = v - present[i]
+        if d > max_rel[i]:
+            v = present[i] + max_rel[i]
+        elif d < -max_rel[i]:
+            v = present[i] - max_rel[i]
+        if abs(v - goal[i]) > 1e-4:
+            rel_clamped = True
+        if v < lo[i]:
+            v = lo[i]
+        elif v > hi[i]:
+            v = hi[i]
+        present[i] = v
+    return rel_clamped
+
+
+@cache
+def _limits_kernel():
+    """
+    numba-compiled _apply_limits, or the plain-Python one when numba is missing.
+    numba is imported here rather than at module level: lerobot-teleoperate imports this module for
+    every robot type, and the import alone costs ~0.2 s.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return _apply_limits
+    # fastmath is left off on purpose: unset limits are +/-inf, which fastmath is allowed to assume away
+    return njit(cache=True)(_apply_limits)
+
+
+class _StateListener(WSListener):
+    """
+    picows callback sink: keeps only the newest data frame as (is_binary, payload).
+    get_observation() reads it from the control thread without a hop through the loop.
+    In msgpack mode the server's "hello" reply resolves `hello` with its joint names instead.
+    """
+
+    def __init__(self, on_disconnected, wire_format: str):
+        super().__init__()
+        self.latest: tuple[bool, bytes] | None = None
+        # created by ws_connect's listener factory, i.e. on the loop thread
+        self.hello: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.writable = asyncio.Event()
+        self.writable.set()
+        self._on_disconnected = on_disconnected
+        self._wants_hello = wire_format == "msgpack"
+
+    def on_ws_frame(self, transport: WSTransport, frame: WSFrame):
+        if frame.msg_type == WSMsgType.BINARY or frame.msg_type == WSMsgType.TEXT:
+            # payload memory is reused by picows once the callback returns, so copy it out
+            is_binary = frame.msg_type == WSMsgType.BINARY
+            payload = frame.get_payload_as_bytes()
+            if is_binary and self._wants_hello and not self.hello.done():
+                # an exception escaping this callback makes picows drop the connection
+                try:
+                    msg = msgpack.unpackb(payload, raw=False)
+                except Exception:
+                    msg = None
+                if isinstance(msg, dict) and msg.get("type") == "hello":
+                    self.hello.set_result(msg.get("names"))
+                    return
+            self.latest = (is_binary, payload)
+        elif frame.msg_type == WSMsgType.CLOSE:
+            transport.send_close(frame.get_close_code(), frame.get_close_message())
+            transport.disconnect()
+
+    def on_ws_disconnected(self, transport: WSTransport):
+        self._on_disconnected()
+        self.writable.set()  # don't leave the writer parked
+
+    def pause_writing(self):
+        self.writable.clear()
+
+    def resume_writing(self):
+        self.writable.set()
+
+
 class SO101WebSimFollower(Robot):
     """
     Follower that streams joint positions to a simulator over WebSocket.
@@ -19,22 +138,68 @@ class SO101WebSimFollower(Robot):
     name = "so101_websim_follower"
 
     def __init__(self, config: SO101WebSimFollowerConfig):
+        if not PICOWS_AVAILABLE:
+            raise ImportError("so101_websim_follower needs picows: pip install 'lerobot[websim]'")
+        if config.wire_format == "msgpack" and not MSGPACK_AVAILABLE:
+            raise ImportError("wire_format='msgpack' needs msgpack: pip install 'lerobot[websim]'")
         super().__init__(config)
         self.config = config
-        self._ws: websockets.WebSocketClientProtocol | None = None
+        self._ws: WSTransport | None = None
+        self._listener: _StateListener | None = None
+        self._last_frame: tuple[bool, bytes] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: threading.Thread | None = None
+        # latest-wins outbox: send_action overwrites it, _async_writer sends whatever is newest
+        self._latest: bytes | None = None
+        self._outbox: asyncio.Event | None = None
+        self._writer: asyncio.Task | None = None
         self._seq = 0
         self._last_send_log = 0.0
-        self._last_obs: dict[str, Any] = {f"{jn}.pos": 0.0 for jn in self.config.joint_names}
-        self._last_obs["timestamp"] = time.time()
+        self._pos_keys = tuple(f"{jn}.pos" for jn in self.config.joint_names)
+        self._name_to_idx = {jn: i for i, jn in enumerate(self.config.joint_names)}
+        self._key_to_idx = {key: i for i, key in enumerate(self._pos_keys)}
+        # long-lived msgpack codec state (both used from the control thread only); json mode runs without msgpack
+        self._packer = msgpack.Packer(use_bin_type=True) if MSGPACK_AVAILABLE else None
+        self._unpacker = msgpack.Unpacker(raw=False) if MSGPACK_AVAILABLE else None
+        # reused every tick: get_observation/send_action hand these out instead of fresh copies
+        self._last_obs: dict[str, Any] = dict.fromkeys(self._pos_keys, 0.0)
+        self._sent: dict[str, Any] = dict.fromkeys(self._pos_keys, 0.0)
+        self._last_ts = time.time()
+        self._warned_state_len = False
+
+        # plain-Python limits until connect() swaps in the compiled kernel
+        self._limits = _apply_limits
+        # per-joint arrays in joint_names order for _apply_limits; unset limits are +/-inf so they never bind
+        n = len(self.config.joint_names)
+        self._last_q = np.zeros(n)
+        self._goal = np.zeros(n)
+        if self.config.joint_min and self.config.joint_max:
+            # the limits kernel does not bounds-check, so a short list would read past the array
+            if not len(self.config.joint_min) == len(self.config.joint_max) == n:
+                raise ValueError("joint_min and joint_max must have one entry per joint in joint_names.")
+            self._lo = np.asarray(self.config.joint_min, dtype=float)
+            self._hi = np.asarray(self.config.joint_max, dtype=float)
+        else:
+            self._lo = np.full(n, -np.inf)
+            self._hi = np.full(n, np.inf)
+        mrt = self.config.max_relative_target
+        if mrt is None:
+            self._max_rel = np.full(n, np.inf)
+        elif isinstance(mrt, dict):
+            if set(mrt) != set(self.config.joint_names):
+                raise ValueError("max_relative_target keys must match joint_names.")
+            self._max_rel = np.asarray([mrt[jn] for jn in self.config.joint_names], dtype=float)
+        else:
+            self._max_rel = np.full(n, float(mrt))
 
     # ---------- features ----------
     @cached_property
     def action_features(self) -> dict[str, type]:
-        return {f"{jn}.pos": float for jn in self.config.joint_names}
+        return dict.fromkeys(self._pos_keys, float)
 
     @cached_property
     def observation_features(self) -> dict[str, type]:
-        return {**{f"{jn}.pos": float for jn in self.config.joint_names}, "timestamp": float}
+        return {**dict.fromkeys(self._pos_keys, float), "timestamp": float}
 
     # ---------- connection ----------
     @property
@@ -44,140 +209,286 @@ class SO101WebSimFollower(Robot):
     def connect(self, calibrate: bool = False) -> None:
         if self.is_connected:
             raise RuntimeError(f"{self} already connected")
+        if self._loop is None:
+            self._start_loop()
+        # compile the limits kernel now so the first real action doesn't pay the JIT cost
+        self._limits = _limits_kernel()
+        self._limits(self._last_q, self._last_q.copy(), self._lo, self._hi, self._max_rel)
         # small retry window so you can start teleop first, then the server
         for attempt in range(10):
             try:
                 self._run(self._async_connect(), timeout=2.0)
-                print("[websim follower] connected")
+                print(f"[websim follower] connected to {self.config.ws_url} ({self.config.wire_format})")
                 break
             except Exception as e:
                 print(f"[websim follower] connect failed ({attempt+1}/10): {e}")
                 time.sleep(0.5)
         if not self.is_connected:
+            self._stop_loop()
             raise RuntimeError("websim follower: cannot connect to simulator")
 
     def disconnect(self) -> None:
         if not self.is_connected:
             raise RuntimeError(f"{self} is not connected")
         self._run(self._async_disconnect())
+        self._stop_loop()
         print("[websim follower] disconnected")
 
     # ---------- I/O ----------
     def get_observation(self) -> dict[str, Any]:
-        msg = self._run(self._async_try_recv(), timeout=0.0)
-        if msg:
+        """
+        Latest joint state. The returned dict is reused and overwritten by the next call,
+        so consume it (or copy it) before polling again; do not mutate it.
+        """
+        # newest frame pushed by the listener; skip it if we already parsed it
+        frame = self._listener.latest if self._listener else None
+        if frame is not None and frame is not self._last_frame:
+            self._last_frame = frame
             try:
-                data = json.loads(msg)
-                if data.get("type") == "state":
-                    if "names" in data and "joint_pos" in data:
-                        name_to_val = dict(zip(data["names"], data["joint_pos"]))
-                    elif "joint_pos" in data and isinstance(data["joint_pos"], list):
-                        name_to_val = dict(zip(self.config.joint_names, data["joint_pos"]))
-                    else:
-                        name_to_val = {}
-                    for jn, v in name_to_val.items():
-                        key = f"{jn}.pos"
-                        if key in self._last_obs:
-                            self._last_obs[key] = float(v)
-                    self._last_obs["timestamp"] = float(data.get("timestamp", time.time()))
+                self._parse_state(self._decode(*frame))
             except Exception:
                 pass
-        return dict(self._last_obs)
+        # the string-keyed dict is only materialized here, for the caller
+        for key, v in zip(self._pos_keys, self._last_q.tolist(), strict=True):
+            self._last_obs[key] = v
+        self._last_obs["timestamp"] = self._last_ts
+        return self._last_obs
 
-    def send_action(self, action: dict[str, Any]) -> dict[str, Any]:
-        # Extract goal positions keyed like '<joint>.pos'
-        goal_pos = {k.removesuffix(".pos"): float(v) for k, v in action.items() if k.endswith(".pos")}
+    def _parse_state(self, data: dict | list) -> None:
+        if isinstance(data, list):
+            # compact msgpack state: [joint_pos, timestamp], joint order checked at handshake
+            joint_pos, ts = data
+            self._copy_positional(joint_pos)
+        elif data.get("type") == "state" and "joint_pos" in data:
+            names = data.get("names")
+            if names is None or names == self.config.joint_names:
+                # same order as ours: one positional copy, no per-joint dict
+                self._copy_positional(data["joint_pos"])
+            else:
+                for jn, v in zip(names, data["joint_pos"], strict=False):
+                    i = self._name_to_idx.get(jn)
+                    if i is not None:
+                        self._last_q[i] = v
+            ts = data.get("timestamp", time.time())
+        else:
+            return
+        self._last_ts = float(ts)
 
-        # Guard: if empty, surface it loudly (helps catch key-name mismatches)
-        if not goal_pos:
-            print("[websim follower] WARN: outgoing goal_pos is empty — check action keys end with '.pos'")
-            # still proceed with last obs (no-op move)
+    def _copy_positional(self, joint_pos: list) -> None:
+        n = len(self._last_q)
+        if len(joint_pos) == n:
+            self._last_q[:] = joint_pos
+            return
+        # like the by-name path: keep the joints both sides have instead of dropping the whole frame
+        if not self._warned_state_len:
+            logger.warning(f"Simulator state has {len(joint_pos)} joint positions, expected {n}.")
+            self._warned_state_len = True
+        m = min(len(joint_pos), n)
+        self._last_q[:m] = joint_pos[:m]
 
-        # Optional relative safety
-        if self.config.max_relative_target is not None:
-            present = {k.removesuffix(".pos"): self._last_obs[k] for k in self._last_obs if k.endswith(".pos")}
-            goal_present = {jn: (goal_pos.get(jn, present[jn]), present[jn]) for jn in self.config.joint_names}
-            goal_pos = ensure_safe_goal_position(goal_present, self.config.max_relative_target)
+    def send_action(self, action: dict[str, Any]) -> dict[str, Any]:
+        """
+        Stream the (limited) joint targets. Like get_observation, the returned dict is reused
+        and overwritten by the next call; do not mutate it.
+        """
+        # Goal positions in joint_names order, gathered into a reused buffer in one pass;
+        # joints missing from the action hold their present position
+        goal = self._goal
+        goal[:] = self._last_q
+        found = False
+        for key, v in action.items():
+            i = self._key_to_idx.get(key)
+            if i is not None:
+                goal[i] = v
+                found = True
+        if not found:
+            print("[websim follower] WARN: outgoing goal_pos is empty — check action keys are '<joint>.pos'")
+            # still proceed with last obs (no-op move)
+        # NaN/inf would be written differently by orjson (null) and the stdlib (NaN), and neither is a
+        # position the sim can use: those joints hold their present position too
+        if not np.isfinite(goal).all():
+            bad = ~np.isfinite(goal)
+            goal[bad] = self._last_q[bad]
+            names = [jn for jn, b in zip(self.config.joint_names, bad, strict=True) if b]
+            logger.warning(f"Non-finite goal position for {names}, holding present position.")
 
-        # Optional absolute clamp
-        if self.config.joint_min and self.config.joint_max:
-            clamped = {}
-            for i, jn in enumerate(self.config.joint_names):
-                lo = self.config.joint_min[i]
-                hi = self.config.joint_max[i]
-                val = goal_pos.get(jn, self._last_obs[f"{jn}.pos"])
-                clamped[jn] = min(max(val, lo), hi)
-            goal_pos = clamped
+        # Relative safety (same rule as ensure_safe_goal_position), then absolute clamp; _last_q becomes the target
+        if self._limits(goal, self._last_q, self._lo, self._hi, self._max_rel):
+            logger.warning(
+                "Relative goal position magnitude had to be clamped to be safe.\n"
+                f"{dict(zip(self.config.joint_names, goal.tolist(), strict=True))} -> "
+                f"{dict(zip(self.config.joint_names, self._last_q.tolist(), strict=True))}"
+            )
 
         self._seq += 1
-        payload = {
-            "type": "cmd",
-            "seq": self._seq,
-            "mode": "joint_position",
-            "names": self.config.joint_names,
-            "target": [goal_pos.get(jn, self._last_obs[f"{jn}.pos"]) for jn in self.config.joint_names],
-            "timestamp": time.time(),
-        }
-
-        # debug print: first 3 joints (rate-limited)
-        now = time.time()
-        if now - self._last_send_log > 1.0 or self._seq < 5:
-            print("[websim follower ->cmd]", ", ".join(f"{v:+.3f}" for v in payload["target"][:3]), "…")
-            self._last_send_log = now
+        target = self._last_q.tolist()
+        ts = time.time()  # one clock read per tick: wire timestamp and log gate
 
-        try:
-            self._run(self._async_send(payload))
-        except Exception as e:
-            print(f"[websim follower] send failed: {e}")
+        # debug log: first 3 joints (rate-limited; nothing is formatted unless DEBUG is on)
+        if ts - self._last_send_log > 1.0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[websim follower ->cmd] %s …", ", ".join(f"{v:+.3f}" for v in target[:3]))
+            self._last_send_log = ts
+
+        # fire-and-forget: overwrite the outbox and wake the writer; an unsent older target is simply dropped
+        self._latest = self._cmd(self._seq, target, ts)
+        self._call_soon(self._wake_writer)
 
-        # optimistic update
-        for i, jn in enumerate(self.config.joint_names):
-            self._last_obs[f"{jn}.pos"] = payload["target"][i]
-        self._last_obs["timestamp"] = payload["timestamp"]
-        return {f"{jn}.pos": payload["target"][i] for i, jn in enumerate(self.config.joint_names)}
+        # optimistic update (_last_q already holds the target)
+        self._last_ts = ts
+        for key, v in zip(self._pos_keys, target, strict=True):
+            self._sent[key] = v
+        return self._sent
 
     # ---------- tiny asyncio helpers ----------
+    def _start_loop(self) -> None:
+        # one persistent loop in a daemon thread; sync calls hop onto it instead of re-entering a loop each tick.
+        # uvloop is used for this private loop only, the process-wide asyncio policy is left alone
+        self._loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="websim-follower-ws", daemon=True)
+        self._loop_thread.start()
+
+    def _stop_loop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
+
     def _run(self, coro, timeout: Optional[float] = None):
-        loop = asyncio.get_event_loop()
-        task = coro if timeout is None else asyncio.wait_for(coro, timeout=timeout)
+        if self._loop is None:
+            coro.close()
+            raise RuntimeError(f"{self} is not connected")
+        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
         try:
-            return loop.run_until_complete(task)
-        except asyncio.TimeoutError:
+            return fut.result(timeout)
+        except concurrent.futures.TimeoutError:
+            fut.cancel()
             return None
 
+    def _call_soon(self, callback, *args) -> None:
+        if self._loop is None:
+            raise RuntimeError(f"{self} is not connected")
+        self._loop.call_soon_threadsafe(callback, *args)
+
     async def _async_connect(self):
-        self._ws = await websockets.connect(
+        # a writer left over from a connection the server dropped must not outlive it
+        if self._writer:
+            self._writer.cancel()
+            self._writer = None
+        self._ws, self._listener = await ws_connect(
+            lambda: _StateListener(self._on_ws_disconnected, self.config.wire_format),
             self.config.ws_url,
-            max_size=2**20,
-            ping_interval=None,   # disable client pings
+            max_frame_size=2**20,
+            # no auto-ping, so keepalive pings stay disabled. picows never offers permessage-deflate,
+            # so frames stay uncompressed whatever the server supports
         )
+        if self.config.wire_format == "msgpack":
+            # names/mode never change: send them once so every cmd is just [seq, target, timestamp]
+            self._ws.send(WSMsgType.BINARY, self._hello)
+            # compact states carry no names: check the server's joint order once, then trust it
+            try:
+                names = await asyncio.wait_for(self._listener.hello, timeout=1.0)
+                if names != self.config.joint_names:
+                    raise ValueError(f"simulator joint names {names} do not match {self.config.joint_names}")
+            except BaseException:
+                await self._async_disconnect()
+                raise
+        self._outbox = asyncio.Event()
+        self._writer = asyncio.create_task(self._async_writer())
 
     async def _async_disconnect(self):
-        try:
-            if self._ws:
-                await self._ws.close()
-        finally:
-            self._ws = None
+        if self._writer:
+            self._writer.cancel()
+            self._writer = None
+        self._latest = None
+        ws, self._ws = self._ws, None
+        if ws:
+            ws.send_close(WSCloseCode.OK)
+            ws.disconnect()
+            await ws.wait_disconnected()
+        self._listener = None
 
-    async def _async_send(self, payload: dict):
-        if not self._ws:
-            raise RuntimeError("websocket not connected")
-        try:
-            await self._ws.send(json.dumps(payload))
-        except websockets.ConnectionClosed:
-            self._ws = None
-            raise
+    def _on_ws_disconnected(self) -> None:
+        # loop thread: the server went away (or we closed); wake the writer so it sees that and exits
+        self._ws = None
+        if self._outbox:
+            self._outbox.set()
 
-    async def _async_try_recv(self) -> Optional[str]:
+    def _wake_writer(self) -> None:
+        # loop thread: runs detached from send_action, so failures are reported here rather than raised
         if not self._ws:
-            return None
-        try:
-            return await asyncio.wait_for(self._ws.recv(), timeout=0.0)
-        except asyncio.TimeoutError:
-            return None
-        except websockets.ConnectionClosed:
-            self._ws = None
-            return None
+            print("[websim follower] send failed: websocket not connected")
+            return
+        self._outbox.set()
+
+    async def _async_writer(self):
+        # for joint position control only the newest target matters, so under load N actions collapse into 1 write
+        sent = None
+        while self._ws:
+            await self._outbox.wait()
+            self._outbox.clear()
+            # while the transport buffer is full, hold off here and let newer targets replace this one
+            await self._listener.writable.wait()
+            frame = self._latest
+            if not self._ws:
+                if frame is not None and frame is not sent:
+                    print("[websim follower] send failed: websocket closed")
+                break
+            if frame is not None and frame is not sent:
+                self._ws.send(self._opcode, frame)
+                sent = frame
+
+    # ---------- wire codec ----------
+    @cached_property
+    def _hello(self) -> bytes:
+        return msgpack.packb(
+            {"type": "hello", "names": self.config.joint_names, "mode": "joint_position"}, use_bin_type=True
+        )
+
+    @cached_property
+    def _opcode(self) -> WSMsgType:
+        return WSMsgType.BINARY if self.config.wire_format == "msgpack" else WSMsgType.TEXT
+
+    def _cmd(self, seq: int, target: list[float], ts: float) -> bytes:
+        # msgpack goes out as a compact binary frame, json as the full (DexSuite) text frame
+        if self.config.wire_format == "msgpack":
+            return self._packer.pack((seq, target, ts))
+        # json: constant head is cached, only seq/target/timestamp are formatted per tick
+        return b"".join(
+            (
+                self._json_cmd_head,
+                str(seq).encode(),
+                b',"target":',
+                self._json_dumps(target),
+                b',"timestamp":',
+                repr(ts).encode(),
+                b"}",
+            )
+        )
+
+    @cached_property
+    def _json_cmd_head(self) -> bytes:
+        head = self._json_dumps({"type": "cmd", "mode": "joint_position", "names": self.config.joint_names})
+        return head[:-1] + b',"seq":'
+
+    def _decode(self, is_binary: bool, payload: bytes) -> dict | list:
+        # decode by frame type so either server flavour can answer
+        if is_binary:
+            if self._unpacker is None:
+                raise ValueError("binary (msgpack) frame received but msgpack is not installed")
+            self._unpacker.feed(payload)
+            try:
+                return self._unpacker.unpack()
+            except Exception:
+                # a truncated/garbage frame must not poison the next ones
+                self._unpacker = msgpack.Unpacker(raw=False)
+                raise
+        return orjson.loads(payload) if ORJSON_AVAILABLE else json.loads(payload)
+
+    @staticmethod
+    def _json_dumps(obj) -> bytes:
+        # orjson returns utf-8 bytes directly; the stdlib fallback needs the extra encode
+        return orjson.dumps(obj) if ORJSON_AVAILABLE else _json_encode(obj).encode()
 
     # ----- required abstract hooks (no-ops for a simulator) -----
     @property
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+pytest.importorskip("msgpack")
+pytest.importorskip("picows")
+
+import msgpack
+from picows import WSMsgType
+
+from lerobot.robots.so101_websim_follower import (
+    SO101WebSimFollower,
+    SO101WebSimFollowerConfig,
+)
+from lerobot.robots.so101_websim_follower.so101_websim_follower import (
+    _apply_limits,
+    _limits_kernel,
+    _StateListener,
+)
+
+
+@pytest.fixture
+def follower_factory(monkeypatch):
+    """Build followers whose outgoing frames are captured instead of scheduled on the websocket loop."""
+
+    def make(**kwargs):
+        robot = SO101WebSimFollower(SO101WebSimFollowerConfig(**kwargs))
+        call_soon = MagicMock(name="call_soon")
+        monkeypatch.setattr(robot, "_call_soon", call_soon)
+        return robot, call_soon
+
+    return make
+
+
+@pytest.fixture
+def follower(follower_factory):
+    return follower_factory()
+
+
+def _sent_frame(robot) -> bytes:
+    """Frame waiting in the latest-wins outbox."""
+    return robot._latest
+
+
+def test_send_action(follower):
+    robot, call_soon = follower
+    action = {f"{jn}.pos": float(i * 10) for i, jn in enumerate(robot.config.joint_names, 1)}
+
+    returned = robot.send_action(action)
+
+    assert returned == action
+    call_soon.assert_called_once_with(robot._wake_writer)
+    cmd = json.loads(_sent_frame(robot))
+    assert cmd["type"] == "cmd"
+    assert cmd["names"] == robot.config.joint_names
+    assert cmd["target"] == list(action.values())
+
+
+def test_send_action_missing_joint_holds_position(follower):
+    robot, _ = follower
+    robot.send_action({f"{jn}.pos": 5.0 for jn in robot.config.joint_names})
+
+    returned = robot.send_action({"gripper.pos": 7.0})
+
+    assert returned["gripper.pos"] == 7.0
+    assert returned["shoulder_pan.pos"] == 5.0
+
+
+def test_send_action_non_finite_holds_position(follower):
+    robot, _ = follower
+    robot.send_action({f"{jn}.pos": 5.0 for jn in robot.config.joint_names})
+
+    returned = robot.send_action({"gripper.pos": float("nan"), "wrist_roll.pos": float("inf")})
+
+    assert returned["gripper.pos"] == 5.0
+    assert returned["wrist_roll.pos"] == 5.0
+    assert json.loads(_sent_frame(robot))["target"] == [5.0] * 6
+
+
+def test_send_action_relative_limit(follower_factory):
+    robot, _ = follower_factory(max_relative_target=2.0)
+
+    returned = robot.send_action({"shoulder_pan.pos": 10.0, "elbow_flex.pos": -1.0})
+
+    assert returned["shoulder_pan.pos"] == 2.0
+    assert returned["elbow_flex.pos"] == -1.0
+
+
+def test_send_action_absolute_clamp(follower_factory):
+    robot, _ = follower_factory(joint_min=[-1.0] * 6, joint_max=[1.0] * 6)
+
+    returned = robot.send_action({f"{jn}.pos": 3.0 for jn in robot.config.joint_names})
+
+    assert all(v == 1.0 for v in returned.values())
+
+
+def test_joint_limits_length_mismatch_raises():
+    config = SO101WebSimFollowerConfig(joint_min=[-1.0] * 3, joint_max=[1.0] * 3)
+    with pytest.raises(ValueError, match="joint_min and joint_max"):
+        SO101WebSimFollower(config)
+
+
+def test_missing_websim_deps_raise(monkeypatch):
+    module = "lerobot.robots.so101_websim_follower.so101_websim_follower"
+    monkeypatch.setattr(f"{module}.MSGPACK_AVAILABLE", False)
+    SO101WebSimFollower(SO101WebSimFollowerConfig())  # json mode does not need msgpack
+    with pytest.raises(ImportError, match="msgpack"):
+        SO101WebSimFollower(SO101WebSimFollowerConfig(wire_format="msgpack"))
+
+    monkeypatch.setattr(f"{module}.PICOWS_AVAILABLE", False)
+    with pytest.raises(ImportError, match="lerobot\\[websim\\]"):
+        SO101WebSimFollower(SO101WebSimFollowerConfig())
+
+
+def test_send_action_msgpack_compact_cmd(follower_factory):
+    robot, _ = follower_factory(wire_format="msgpack")
+
+    robot.send_action({f"{jn}.pos": 1.0 for jn in robot.config.joint_names})
+
+    seq, target, _ts = msgpack.unpackb(_sent_frame(robot), raw=False)
+    assert seq == 1
+    assert target == [1.0] * 6
+
+
+def test_get_observation_parses_latest_frame(follower):
+    robot, _ = follower
+    names = robot.config.joint_names
+    state = {
+        "type": "state",
+        "names": names[::-1],
+        "joint_pos": [0.0, 1.0, 2.0, 3.0, 4.0, 5.0],
+        "timestamp": 1.5,
+    }
+    robot._listener = MagicMock(latest=(False, json.dumps(state).encode()))
+
+    obs = robot.get_observation()
+
+    assert obs["gripper.pos"] == 0.0
+    assert obs["shoulder_pan.pos"] == 5.0
+    assert obs["timestamp"] == 1.5
+
+    robot._listener.latest = (True, msgpack.packb(([1.0] * 6, 2.5)))
+    obs = robot.get_observation()
+
+    assert all(obs[f"{jn}.pos"] == 1.0 for jn in names)
+    assert obs["timestamp"] == 2.5
+
+
+def test_get_observation_keeps_overlap_of_short_nameless_state(follower):
+    robot, _ = follower
+    robot._listener = MagicMock(latest=(True, msgpack.packb(([1.0, 2.0], 4.0))))
+
+    obs = robot.get_observation()
+
+    assert obs["shoulder_pan.pos"] == 1.0
+    assert obs["shoulder_lift.pos"] == 2.0
+    assert obs["gripper.pos"] == 0.0
+    assert obs["timestamp"] == 4.0
+
+
+def test_get_observation_recovers_from_bad_msgpack_frame(follower):
+    robot, _ = follower
+    robot._listener = MagicMock(latest=(True, b"\x92\x96"))  # truncated array
+    robot.get_observation()
+
+    robot._listener.latest = (True, msgpack.packb(([2.0] * 6, 3.0)))
+    obs = robot.get_observation()
+
+    assert obs["gripper.pos"] == 2.0
+    assert obs["timestamp"] == 3.0
+
+
+def _frame(msg_type, payload: bytes):
+    return MagicMock(msg_type=msg_type, get_payload_as_bytes=MagicMock(return_value=payload))
+
+
+@pytest.mark.parametrize("wire_format", ["json", "msgpack"])
+def test_listener_survives_undecodable_binary_frame(wire_format):
+    async def feed():
+        listener = _StateListener(MagicMock(), wire_format)
+        listener.on_ws_frame(MagicMock(), _frame(WSMsgType.BINARY, b"\xc1"))
+        listener.on_ws_frame(MagicMock(), _frame(WSMsgType.TEXT, b'{"type":"state"}'))
+        return listener
+
+    listener = asyncio.run(feed())
+
+    assert not listener.hello.done()
+    assert listener.latest == (False, b'{"type":"state"}')
+
+
+def test_listener_only_waits_for_hello_in_msgpack_mode():
+    hello = msgpack.packb({"type": "hello", "names": ["a", "b"]})
+
+    async def feed(wire_format):
+        listener = _StateListener(MagicMock(), wire_format)
+        listener.on_ws_frame(MagicMock(), _frame(WSMsgType.BINARY, hello))
+        return listener
+
+    json_listener = asyncio.run(feed("json"))
+    msgpack_listener = asyncio.run(feed("msgpack"))
+
+    assert not json_listener.hello.done()
+    assert json_listener.latest == (True, hello)
+    assert msgpack_listener.hello.result() == ["a", "b"]
+    assert msgpack_listener.latest is None
+
+
+def test_writer_exits_when_server_drops(follower):
+    robot, _ = follower
+
+    async def drop():
+        robot._ws = MagicMock()
+        robot._listener = _StateListener(robot._on_ws_disconnected, "json")
+        robot._outbox = asyncio.Event()
+        robot._writer = asyncio.create_task(robot._async_writer())
+        await asyncio.sleep(0)
+        robot._listener.on_ws_disconnected(MagicMock())
+        await asyncio.wait_for(robot._writer, timeout=1.0)
+
+    asyncio.run(drop())
+
+    assert not robot.is_connected
+
+
+def test_limits_kernel_matches_python():
+    present_py, present_kernel = np.zeros(3), np.zeros(3)
+    args = (np.array([5.0, -5.0, 0.5]),)
+    bounds = (np.full(3, -1.0), np.full(3, 4.0), np.full(3, 2.0))
+
+    assert _apply_limits(*args, present_py, *bounds) == _limits_kernel()(*args, present_kernel, *bounds)
+    np.testing.assert_array_equal(present_py, present_kernel)
+    np.testing.assert_array_equal(present_py, [2.0, -1.0, 0.5])
+
+
+@pytest.mark.parametrize("names_ok", [True, False])
+def test_msgpack_connect_checks_server_joint_names(names_ok):
+    robot = SO101WebSimFollower(SO101WebSimFollowerConfig(wire_format="msgpack"))
+    transport = MagicMock()
+    transport.wait_disconnected.return_value = asyncio.sleep(0)
+
+    async def fake_ws_connect(listener_factory, url, **kwargs):
+        listener = listener_factory()
+        names = robot.config.joint_names if names_ok else ["other"]
+        listener.hello.set_result(names)
+        return transport, listener
+
+    async def connect():
+        with patch("lerobot.robots.so101_websim_follower.so101_websim_follower.ws_connect", fake_ws_connect):
+            await robot._async_connect()
+        await robot._async_disconnect()
+
+    if names_ok:
+        asyncio.run(connect())
+    else:
+        with pytest.raises(ValueError, match="do not match"):
+            asyncio.run(connect())
+
+    assert transport.send.call_args.args[1] == robot._hello
+    assert not robot.is_connected